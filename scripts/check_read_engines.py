@@ -0,0 +1,34 @@
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+# read_projects must return the same frame with the C and the pyarrow parsers
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / 'src'))
+from capital_budgeting_extended import read_projects
+
+# missing markers in numeric columns (-> 0), 'NA' / '' kept in text columns, free text
+NA_CSV = """proj_id,name,cost,benefit,region,requires,exclusive_group,labour,priority
+NA,A,100,n/a,NA,,,5,1
+P02,B,200,50,R2,NA,G1,,2
+P03,,N/A,70,R1,NA;P02,G1,null,
+,NA,nan,NaN,,,NA,7,3
+"""
+TEXT_CSV = """proj_id,name,cost,benefit,region
+P01,A,100,abc,R1
+P02,B,,50,R2
+"""
+
+with tempfile.TemporaryDirectory() as tmp:
+    paths = [ROOT / 'data' / 'projects_example.csv']
+    for name, content in (('na.csv', NA_CSV), ('text.csv', TEXT_CSV)):
+        paths.append(Path(tmp) / name)
+        paths[-1].write_text(content)
+    for path in paths:
+        for usecols in (None, ['proj_id', 'region', 'cost']):
+            c_df = read_projects(path, usecols=usecols, engine='c')
+            arrow_df = read_projects(path, usecols=usecols, engine='pyarrow')
+            pd.testing.assert_frame_equal(c_df, arrow_df)
+        print(f"{path.name}: C and pyarrow engines agree")
@@ -7,11 +7,11 @@ print(df.head())
 
 # Basic validation
 errors = []
-if df['proj_id'].duplicated().any():
+if not df['proj_id'].is_unique:
     errors.append("proj_id duplicates found")
-if (df['cost'] <= 0).any():
+if df['cost'].min() <= 0:
     errors.append("Some costs <= 0")
-if (df['benefit'] <= 0).any():
+if df['benefit'].min() <= 0:
     errors.append("Some benefits <= 0")
 if not errors:
     print("Basic validation passed")
@@ -19,10 +19,9 @@ else:
     print("Validation errors:", errors)
 
 # Example: list projects that require missing prereqs
-reqs = df['requires'].fillna('').astype(str)
-for idx, r in reqs.items():
-    if r.strip():
-        for rid in r.split(';'):
-            rid = rid.strip()
-            if rid and rid not in df['proj_id'].values:
-                print(f"Warning: project {df.loc[idx,'proj_id']} requires missing project {rid}")
+pid_set = frozenset(df['proj_id'].to_numpy())
+reqs = df[['proj_id']].assign(r=df['requires'].fillna('').astype(str).str.split(';')).explode('r')
+reqs['r'] = reqs['r'].str.strip()
+missing = reqs[(reqs['r'] != '') & ~reqs['r'].isin(pid_set)]
+for pid, rid in missing.itertuples(index=False, name=None):
+    print(f"Warning: project {pid} requires missing project {rid}")
@@ -1,16 +1,31 @@
 # src/capital_budgeting.py
 import csv
+import numpy as np
 import pandas as pd
 import gurobipy as gp
 from gurobipy import GRB
 
+from model_utils import (NUMERIC_NA_VALUES, dependency_closure, dependency_matrix, greedy_start,
+                         incidence_matrix)
+
 def read_projects(csv_path):
     """Read projects CSV -> DataFrame expected columns:
        proj_id,cost,benefit,group,requires,region,resource_1,resource_2,... (optional)
        'requires' may be semicolon-separated list of proj_ids.
     """
-    df = pd.read_csv(csv_path, dtype={'proj_id':str})
-    df.fillna('', inplace=True)
+    header = pd.read_csv(csv_path, nrows=0).columns
+    num_cols = [c for c in ('cost', 'benefit') if c in header]
+    dtype = {c: 'float64' for c in num_cols}
+    dtype.update({c: str for c in ('proj_id', 'requires') if c in header})
+    dtype.update({c: 'category' for c in ('group', 'region') if c in header})
+    read_kw = dict(engine='c', keep_default_na=False, na_values={c: NUMERIC_NA_VALUES for c in num_cols})
+    try:
+        df = pd.read_csv(csv_path, dtype=dtype, **read_kw)
+    except ValueError:
+        # free text in cost/benefit: read as text, then coerce (-> 0)
+        df = pd.read_csv(csv_path, dtype={**dtype, **{c: str for c in num_cols}}, **read_kw)
+        df[num_cols] = df[num_cols].apply(pd.to_numeric, errors='coerce')
+    df[num_cols] = df[num_cols].fillna(0)
     return df
 
 def build_and_solve(df_projects,
@@ -33,8 +48,11 @@ def build_and_solve(df_projects,
     pool_solutions: if >0, ask Gurobi to fill solution pool up to that many
     """
     projects = df_projects['proj_id'].tolist()
-    cost = df_projects.set_index('proj_id')['cost'].to_dict()
-    benefit = df_projects.set_index('proj_id')['benefit'].to_dict()
+    # position of each project in the decision vector x (MVar)
+    pid2i = {p: i for i, p in enumerate(projects)}
+    # coefficient vectors aligned with `projects` order
+    cost_arr = df_projects['cost'].to_numpy(dtype=float)
+    benefit_arr = df_projects['benefit'].to_numpy(dtype=float)
 
     m = gp.Model("CapitalBudgeting")
     # params
@@ -44,43 +62,55 @@ def build_and_solve(df_projects,
         m.Params.PoolSearchMode = 2  # find diverse solutions
         m.Params.PoolSolutions = pool_solutions
 
-    # decision vars (characteristic function)
-    x = m.addVars(projects, vtype=GRB.BINARY, name='x')
+    # decision vars (characteristic function), x[i] <-> projects[i]
+    x = m.addMVar(len(projects), vtype=GRB.BINARY, name='x')
 
     # objective
     if maximize:
-        m.setObjective(gp.quicksum(benefit[p] * x[p] for p in projects), GRB.MAXIMIZE)
+        m.setObjective(benefit_arr @ x, GRB.MAXIMIZE)
     else:
-        m.setObjective(gp.quicksum(benefit[p] * x[p] for p in projects), GRB.MINIMIZE)
+        m.setObjective(benefit_arr @ x, GRB.MINIMIZE)
 
     # budget
-    m.addConstr(gp.quicksum(cost[p] * x[p] for p in projects) <= budget, name='Budget')
+    m.addConstr(cost_arr @ x <= budget, name='Budget')
 
     # cardinality
     if K is not None:
-        m.addConstr(gp.quicksum(x[p] for p in projects) <= K, name='Cardinality')
+        m.addConstr(x.sum() <= K, name='Cardinality')
 
-    # exclusivity groups
+    # exclusivity groups: one sparse row per group, added in a single call
     if groups_exclusive:
-        for idx, group in enumerate(groups_exclusive):
-            # ensure group members are in projects
-            members = [p for p in group if p in projects]
-            if members:
-                m.addConstr(gp.quicksum(x[p] for p in members) <= 1, name=f'Excl_{idx}')
+        # ensure group members are in projects
+        member_rows = [[pid2i[p] for p in group if p in pid2i] for group in groups_exclusive]
+        member_rows = [r for r in member_rows if r]
+        if member_rows:
+            m.addMConstr(incidence_matrix(member_rows, len(projects)), x, '<',
+                         np.ones(len(member_rows)), name='Excl')
 
-    # dependencies
+    # dependencies: one sparse row per edge, added in a single call
+    i_idx = j_idx = None
     if dependencies:
-        for (i,j) in dependencies:
-            if i in projects and j in projects:
-                m.addConstr(x[j] <= x[i], name=f'Dep_{i}_{j}')
+        edges = [(pid2i[i], pid2i[j]) for (i, j) in dependencies if i in pid2i and j in pid2i]
+        if edges:
+            i_idx, j_idx = np.array(edges, dtype=np.int64).T
+            m.addMConstr(dependency_matrix(i_idx, j_idx, len(projects)), x, '<',
+                         np.zeros(len(edges)), name='Dep')
 
-    # resource constraints (resource_caps dict expected)
+    # resource constraints (resource_caps dict expected), one row per resource
+    R_mat = cap_arr = None
     if resource_caps:
-        for rname, cap in resource_caps.items():
-            if rname in df_projects.columns:
-                cons = gp.quicksum(df_projects.set_index('proj_id').loc[p, rname] * x[p]
-                                   for p in projects)
-                m.addConstr(cons <= cap, name=f'Resource_{rname}')
+        rnames = [rname for rname in resource_caps if rname in df_projects.columns]
+        if rnames:
+            R_mat = df_projects[rnames].to_numpy(dtype=float).T
+            cap_arr = np.array([resource_caps[rname] for rname in rnames], dtype=float)
+            m.addConstr(R_mat @ x <= cap_arr, name='Resource')
+
+    # warm start from a greedy benefit/cost selection
+    if maximize:
+        start = greedy_start(cost_arr, benefit_arr, budget, K=K, R_mat=R_mat, cap_arr=cap_arr)
+        if i_idx is not None:
+            start = dependency_closure(start, i_idx, j_idx)
+        x.Start = start
 
     m.optimize()
 
@@ -91,15 +121,14 @@ def build_and_solve(df_projects,
         if pool_solutions and m.SolCount > 0:
             for s in range(min(int(m.SolCount), pool_solutions)):
                 sol = {}
-                m.setParam('SolutionNumber', s)
-                selected = [p for p in projects if x[p].Xn > 0.5]  # Xn reads from solution s
-                obj = m.PoolObjVal if s==0 and hasattr(m, 'PoolObjVal') else m.getObjective().getValue()
+                m.Params.SolutionNumber = s
+                selected = [p for p, v in zip(projects, x.Xn) if v > 0.5]  # Xn reads all of solution s at once
                 sol['solution_no'] = s
                 sol['selected'] = selected
-                sol['objective'] = m.getAttr(GRB.Attr.PoolObjVal, s) if hasattr(m, 'PoolObjVal') else m.ObjVal
+                sol['objective'] = m.PoolObjVal  # objective of solution s
                 sols.append(sol)
         else:
-            selected = [p for p in projects if x[p].X > 0.5]
+            selected = [p for p, v in zip(projects, x.X) if v > 0.5]
             sols.append({'solution_no': 0, 'selected': selected, 'objective': m.ObjVal})
 
     return {'model': m, 'solutions': sols}
@@ -9,26 +9,256 @@ Reads data from data/projects_example.csv and builds a generic PLNE:
 - supports multi-criteria weighting and solution pool
 """
 
+import hashlib
+
+import numpy as np
 import pandas as pd
 import gurobipy as gp
 from gurobipy import GRB
 from pathlib import Path
 
+from model_utils import (CATEGORY_COLS, NUMERIC_COLS, NUMERIC_NA_VALUES, TEXT_COLS,
+                         dependency_closure, dependency_matrix, greedy_start, incidence_matrix)
+
 # ---------------------------
 # Utility: read dataset
 # ---------------------------
-def read_projects(csv_path: str):
-    df = pd.read_csv(csv_path, dtype={'proj_id': str})
-    df.fillna('', inplace=True)
+def read_projects(csv_path: str, usecols=None, engine='c'):
+    """Load and clean a projects CSV.
+
+    engine: 'c' (pandas default) or 'pyarrow' (multi-threaded parser, faster on
+    large catalogs; requires the pyarrow package). Both return the same values and
+    dtypes for the NUMERIC_COLS / TEXT_COLS / CATEGORY_COLS columns; any other column
+    is left to the parser's own type inference.
+    """
+    header = pd.read_csv(csv_path, nrows=0).columns
+    if usecols is not None:
+        header = [c for c in header if c in usecols]
+    num_cols = [c for c in NUMERIC_COLS if c in header]
+    text_cols = [c for c in TEXT_COLS if c in header]
+    cat_cols = [c for c in CATEGORY_COLS if c in header]
+    dtype = {c: 'float64' for c in num_cols}
+    if engine == 'pyarrow':
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+        # same rules as the C path: missing markers only null out numeric cells, text
+        # columns are never nullable (a proj_id / region 'NA' or '' stays as written)
+        types = {c: pa.float64() for c in num_cols}
+        types.update({c: pa.string() for c in text_cols + cat_cols})
+
+        def read(column_types):
+            opts = pacsv.ConvertOptions(column_types=column_types, null_values=NUMERIC_NA_VALUES,
+                                        strings_can_be_null=False, include_columns=list(header))
+            return pacsv.read_csv(csv_path, convert_options=opts).to_pandas()
+        try:
+            df = read(types)
+        except pa.ArrowInvalid:
+            # free text in a numeric column: read those columns as text, then coerce (-> 0)
+            df = read({**types, **{c: pa.string() for c in num_cols}})
+            df[num_cols] = df[num_cols].apply(pd.to_numeric, errors='coerce')
+        df[text_cols] = df[text_cols].astype(str)
+        df[cat_cols] = df[cat_cols].astype('category')
+    else:
+        dtype.update({c: str for c in text_cols})
+        dtype.update({c: 'category' for c in cat_cols})
+        # only missing markers in numeric columns become NaN; text cells (incl. proj_id)
+        # keep '' / 'NA' as-is
+        read_kw = dict(usecols=usecols, engine='c', keep_default_na=False,
+                       na_values={c: NUMERIC_NA_VALUES for c in num_cols}, memory_map=True)
+        try:
+            df = pd.read_csv(csv_path, dtype=dtype, **read_kw)
+        except ValueError:
+            # free text in a numeric column: read those columns as text, then coerce (-> 0)
+            df = pd.read_csv(csv_path, dtype={**dtype, **{c: str for c in num_cols}}, **read_kw)
+            df[num_cols] = df[num_cols].apply(pd.to_numeric, errors='coerce')
     # ensure numeric columns
-    for col in ['cost', 'benefit', 'labour', 'land', 'social_score', 'priority']:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    df[num_cols] = df[num_cols].fillna(0)
     return df
 
+def parse_dependencies(df):
+    """Return (i, j) pairs, j requires i, from the semicolon-separated 'requires' column."""
+    if 'requires' not in df.columns:
+        return []
+    req = df[['proj_id']].assign(r=df['requires'].fillna('').astype(str).str.split(';')).explode('r')
+    req['r'] = req['r'].str.strip()
+    req = req[req['r'] != '']
+    return list(zip(req['r'].tolist(), req['proj_id'].tolist()))
+
+def parse_exclusive_groups(df):
+    """Return lists of proj_id sharing the same non-empty 'exclusive_group' value."""
+    if 'exclusive_group' not in df.columns:
+        return []
+    return [g.tolist() for name, g in df.groupby('exclusive_group', sort=False, observed=True)['proj_id']
+            if name and str(name).strip()]
+
 # ---------------------------
 # Build & solve extended model
 # ---------------------------
+def _solve_callback(cancel_event=None, x=None, projects=None, on_incumbent=None):
+    """Gurobi callback stopping the search once `cancel_event` is set and, if
+    `on_incumbent` is given, calling it with {'selected', 'obj'} for each improving
+    MIP solution (x[i] <-> projects[i]). Returns None when there is nothing to do."""
+    if cancel_event is None and on_incumbent is None:
+        return None
+    best = [-np.inf]
+
+    def callback(model, where):
+        if cancel_event is not None and cancel_event.is_set():
+            model.terminate()
+        elif on_incumbent is not None and where == GRB.Callback.MIPSOL:
+            obj = model.cbGet(GRB.Callback.MIPSOL_OBJ)
+            if obj > best[0]:
+                best[0] = obj
+                idx = np.flatnonzero(model.cbGetSolution(x) > 0.5)
+                on_incumbent({'selected': [projects[j] for j in idx], 'obj': float(obj)})
+    return callback
+
+def _build_model(df,
+                 budget,
+                 resource_caps=None,
+                 groups_exclusive=None,
+                 dependencies=None,
+                 region_min_max=None,
+                 K=None,
+                 multi_crit_alpha=1.0,
+                 exclude_sets=None,
+                 enforce_priority_one=False):
+    """Build (without solving) the extended PLNE; see `build_solve` for the arguments.
+
+    Returns (model, x, projects) where x is an MVar with x[i] <-> projects[i].
+    Solver parameters (time limit, pool) are left to the caller.
+    """
+    projects = df['proj_id'].tolist()
+    # position of each project in the decision vector x (MVar)
+    pid2i = {p: i for i, p in enumerate(projects)}
+    cost_arr = df['cost'].to_numpy(dtype=float)
+    benefit_arr = df['benefit'].to_numpy(dtype=float)
+
+    # Build combined benefit if multi-criteria requested (alpha == 1 is pure benefit: skip it)
+    if 'social_score' in df.columns and len(benefit_arr) > 0 and multi_crit_alpha < 1.0 - 1e-12:
+        social_arr = df['social_score'].to_numpy(dtype=float)
+        # normalize benefit and social_score to [0,1] to combine sensibly
+        b_norm = (benefit_arr - benefit_arr.min()) / (np.ptp(benefit_arr) + 1e-9)
+        s_norm = (social_arr - social_arr.min()) / (np.ptp(social_arr) + 1e-9)
+        combined = multi_crit_alpha * b_norm + (1.0 - multi_crit_alpha) * s_norm
+        # scale combined back to similar magnitude as original benefits (optional)
+        # multiply by average benefit to keep magnitudes reasonable
+        benefit_used_arr = combined * benefit_arr.mean()
+    else:
+        benefit_used_arr = benefit_arr
+
+    m = gp.Model("CapitalBudget_Extended")
+
+    # decision variables: one binary per project, x[i] <-> projects[i]
+    x = m.addMVar(len(projects), vtype=GRB.BINARY, name='x')
+
+    # objective
+    m.setObjective(benefit_used_arr @ x, GRB.MAXIMIZE)
+
+    # budget constraint (kept on the model so a cached model can get a new RHS)
+    m._budget_constr = m.addConstr(cost_arr @ x <= budget, name='Budget')
+
+    # cardinality
+    if K is not None:
+        m.addConstr(x.sum() <= K, name='Cardinality')
+
+    # exclusivity groups: one sparse row per group (1 on each member), rhs 1
+    if groups_exclusive:
+        member_rows = [[pid2i[p] for p in group if p in pid2i] for group in groups_exclusive]
+        member_rows = [r for r in member_rows if r]
+        if member_rows:
+            A = incidence_matrix(member_rows, len(projects))
+            m.addMConstr(A, x, '<', np.ones(len(member_rows)), name='Excl')
+
+    # dependencies: one sparse row per edge (i, j) encoding x[j] - x[i] <= 0
+    i_idx = j_idx = None
+    if dependencies:
+        edges = [(pid2i[i], pid2i[j]) for (i, j) in dependencies if i in pid2i and j in pid2i]
+        if edges:
+            i_idx, j_idx = np.array(edges, dtype=np.int64).T
+            A = dependency_matrix(i_idx, j_idx, len(projects))
+            m.addMConstr(A, x, '<', np.zeros(len(edges)), name='Dep')
+
+    # resources constraints: uses columns in df (e.g., 'labour', 'land'), one row per resource
+    R_mat = cap_arr = None
+    if resource_caps:
+        rnames = [rname for rname in resource_caps if rname in df.columns]
+        if rnames:
+            R_mat = df[rnames].to_numpy(dtype=float).T
+            cap_arr = np.array([resource_caps[rname] for rname in rnames], dtype=float)
+            m.addConstr(R_mat @ x <= cap_arr, name='Resource')
+
+    # Exclude exact previous selections (useful for K-best enumeration)
+    if exclude_sets:
+        member_rows = [[pid2i[p] for p in ex_set if p in pid2i] for ex_set in exclude_sets]
+        member_rows = [r for r in member_rows if r]
+        if member_rows:
+            # forbid selecting all members at once (force at least one different choice)
+            A = incidence_matrix(member_rows, len(projects))
+            rhs = np.array([len(r) - 1 for r in member_rows], dtype=float)
+            m.addMConstr(A, x, '<', rhs, name='Exclude')
+
+    # regional quotas (min,max): one sparse block for the max rows, one for the min rows
+    if region_min_max:
+        if 'region' not in df.columns:
+            raise ValueError("region_min_max specified but no 'region' column in df")
+        # positions (aligned with x) of each region's projects, grouped in one pass
+        region_to_indices = df.groupby('region', sort=False, observed=True).indices
+        max_rows, max_rhs, min_rows, min_rhs = [], [], [], []
+        for region, (min_req, max_req) in region_min_max.items():
+            members = region_to_indices.get(region, [])
+            if len(members):
+                if max_req is not None:
+                    max_rows.append(members)
+                    max_rhs.append(max_req)
+                if min_req is not None and min_req > 0:
+                    min_rows.append(members)
+                    min_rhs.append(min_req)
+        if max_rows:
+            m.addMConstr(incidence_matrix(max_rows, len(projects)), x, '<',
+                         np.array(max_rhs, dtype=float), name='RegionMax')
+        if min_rows:
+            m.addMConstr(incidence_matrix(min_rows, len(projects)), x, '>',
+                         np.array(min_rhs, dtype=float), name='RegionMin')
+
+    # optional: force selection of high-priority projects first
+    if enforce_priority_one and 'priority' in df.columns:
+        # ensure at least one priority-1 project if any exist
+        pr1 = np.flatnonzero(df['priority'].to_numpy() == 1)
+        if len(pr1):
+            m.addConstr(x[pr1].sum() >= 1, name='MustOnePriority1')
+
+    # Warm start from a greedy benefit/cost selection (kept on the model so a cached
+    # model can get a start for its new budget)
+    m._start_data = (cost_arr, benefit_used_arr, K, R_mat, cap_arr, i_idx, j_idx)
+    _set_warm_start(m, x, budget)
+
+    return m, x, projects
+
+
+def _set_warm_start(m, x, budget):
+    """Greedy benefit/cost MIP start for `budget`, closed under the dependencies
+    (Gurobi repairs or drops it if infeasible)."""
+    cost_arr, benefit_arr, K, R_mat, cap_arr, i_idx, j_idx = m._start_data
+    start = greedy_start(cost_arr, benefit_arr, budget, K=K, R_mat=R_mat, cap_arr=cap_arr)
+    if i_idx is not None:
+        start = dependency_closure(start, i_idx, j_idx)
+    x.Start = start
+
+
+# solver parameters build_solve may set; a cached model gets them back to their
+# values at build time (caller / environment settings such as OutputFlag untouched)
+_SOLVE_PARAMS = ('TimeLimit', 'Threads', 'Method', 'PoolSearchMode', 'PoolSolutions',
+                 'PoolGap', 'MIPFocus', 'NumericFocus')
+
+
+def _model_key(df, *structure):
+    """Cache key for `build_solve(cache=...)`: the DataFrame content plus every
+    argument that shapes the model (all but the budget and solver parameters)."""
+    digest = hashlib.sha1(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return (tuple(df.columns), digest.hexdigest(), repr(structure))
+
+
 def build_solve(df,
                 budget,
                 resource_caps=None,
@@ -40,7 +270,13 @@ def build_solve(df,
                 pool_solutions=0,
                 pool_gap=None,
                 multi_crit_alpha=1.0,
-                exclude_sets=None):
+                exclude_sets=None,
+                enforce_priority_one=False,
+                threads=None,
+                method=None,
+                cancel_event=None,
+                on_incumbent=None,
+                cache=None):
     """
     df: DataFrame with at least columns ['proj_id','cost','benefit'] (others optional)
     budget: scalar
@@ -53,33 +289,52 @@ def build_solve(df,
     pool_solutions: int (0 = off)
     pool_gap: optional float, relative tolerance for accepting pool solutions (e.g. 0.05 means accept solutions up to 5% worse)
     multi_crit_alpha: weight for benefit in combined objective [0..1]
+    enforce_priority_one: if True, select at least one priority==1 project (when any exist)
+    threads: optional Gurobi Threads (None = Gurobi default, all cores)
+    method: optional Gurobi Method for the root relaxation (e.g. 2 = barrier)
+    cancel_event: optional threading.Event; once set, the search stops at the next
+        Gurobi callback and the best solution found so far (if any) is returned
+    on_incumbent: optional callable, called from the solver with {'selected', 'obj'}
+        each time a better integer solution is found (before the final result)
+    cache: optional dict owned by the caller; the built model is kept there and, on
+        the next call with the same data and constraints, only its budget RHS and MIP
+        start are updated before re-optimizing. The returned 'model' is then the same
+        object as in the previous result; models dropped from the cache when the data
+        change are not disposed, since a previous result may still hold them
     """
-    projects = df['proj_id'].tolist()
-    cost = df.set_index('proj_id')['cost'].to_dict()
-    benefit = df.set_index('proj_id')['benefit'].to_dict()
-
-    # Build combined benefit if multi-criteria requested
-    if 'social_score' in df.columns:
-        social = df.set_index('proj_id')['social_score'].to_dict()
-        # normalize benefit and social_score to [0,1] to combine sensibly
-        b_vals = pd.Series(benefit)
-        s_vals = pd.Series(social)
-        b_norm = (b_vals - b_vals.min()) / (b_vals.max() - b_vals.min() + 1e-9)
-        s_norm = (s_vals - s_vals.min()) / (s_vals.max() - s_vals.min() + 1e-9)
-        combined = {}
-        for p in projects:
-            combined[p] = float(multi_crit_alpha * b_norm.loc[p] + (1.0 - multi_crit_alpha) * s_norm.loc[p])
-        # scale combined back to similar magnitude as original benefits (optional)
-        # multiply by average benefit to keep magnitudes reasonable
-        avg_b = b_vals.mean() if len(b_vals)>0 else 1.0
-        benefit_used = {p: combined[p] * avg_b for p in projects}
+    key = None
+    if cache is not None:
+        key = _model_key(df, resource_caps, groups_exclusive, dependencies, region_min_max,
+                         K, multi_crit_alpha, exclude_sets, enforce_priority_one)
+    if key is not None and key in cache:
+        m, x, projects = cache[key]
+        for name, value in m._base_params.items():
+            if m.getParamInfo(name)[2] != value:
+                m.setParam(name, value)
+        m._budget_constr.RHS = budget
+        _set_warm_start(m, x, budget)
     else:
-        benefit_used = benefit
+        m, x, projects = _build_model(df, budget,
+                                      resource_caps=resource_caps,
+                                      groups_exclusive=groups_exclusive,
+                                      dependencies=dependencies,
+                                      region_min_max=region_min_max,
+                                      K=K,
+                                      multi_crit_alpha=multi_crit_alpha,
+                                      exclude_sets=exclude_sets,
+                                      enforce_priority_one=enforce_priority_one)
+        if key is not None:
+            m._base_params = {name: m.getParamInfo(name)[2] for name in _SOLVE_PARAMS}
+            cache.clear()
+            cache[key] = (m, x, projects)
 
-    m = gp.Model("CapitalBudget_Extended")
     # parameters
     if time_limit is not None:
         m.Params.TimeLimit = time_limit
+    if threads is not None:
+        m.Params.Threads = threads
+    if method is not None:
+        m.Params.Method = method
 
     # CRITICAL: Reset pool-related params to defaults ALWAYS (avoid stale state)
     try:
@@ -111,158 +366,38 @@ def build_solve(df,
             except Exception:
                 pass
 
-    # decision variables
-    x = m.addVars(projects, vtype=GRB.BINARY, name='x')
-
-    # objective
-    m.setObjective(gp.quicksum(benefit_used[p] * x[p] for p in projects), GRB.MAXIMIZE)
-
-    # budget constraint
-    m.addConstr(gp.quicksum(cost[p] * x[p] for p in projects) <= budget, name='Budget')
-
-    # cardinality
-    if K is not None:
-        m.addConstr(x.sum() <= K, name='Cardinality')
-
-    # exclusivity groups
-    if groups_exclusive:
-        for idx, group in enumerate(groups_exclusive):
-            members = [p for p in group if p in projects]
-            if members:
-                m.addConstr(gp.quicksum(x[p] for p in members) <= 1, name=f'Excl_{idx}')
-
-    # dependencies
-    if dependencies:
-        for (i,j) in dependencies:
-            if i in projects and j in projects:
-                m.addConstr(x[j] <= x[i], name=f'Dep_{i}_{j}')
-
-    # resources constraints: uses columns in df (e.g., 'labour', 'land')
-    if resource_caps:
-        for rname, cap in resource_caps.items():
-            if rname in df.columns:
-                cons = gp.quicksum(df.set_index('proj_id').loc[p, rname] * x[p] for p in projects)
-                m.addConstr(cons <= cap, name=f'Resource_{rname}')
-
-    # Exclude exact previous selections (useful for K-best enumeration)
-    if exclude_sets:
-        for ex_idx, ex_set in enumerate(exclude_sets):
-            members = [p for p in ex_set if p in projects]
-            if members:
-                # forbid selecting all members at once (force at least one different choice)
-                m.addConstr(gp.quicksum(x[p] for p in members) <= len(members) - 1, name=f'Exclude_{ex_idx}')
-
-    # regional quotas (min,max)
-    if region_min_max:
-        # build mapping proj -> region
-        if 'region' not in df.columns:
-            raise ValueError("region_min_max specified but no 'region' column in df")
-        region_map = df.set_index('proj_id')['region'].to_dict()
-        # for each region constraint
-        for region, (min_req, max_req) in region_min_max.items():
-            members = [p for p in projects if region_map.get(p,'') == region]
-            if members:
-                if max_req is not None:
-                    m.addConstr(gp.quicksum(x[p] for p in members) <= max_req, name=f'RegionMax_{region}')
-                if min_req is not None and min_req > 0:
-                    m.addConstr(gp.quicksum(x[p] for p in members) >= min_req, name=f'RegionMin_{region}')
-
-    # optional: force selection of high-priority projects first (example)
-    # e.g., ensure at least N priority==1 projects selected (if desired)
-    if 'priority' in df.columns:
-        # example: ensure at least one priority-1 project if any exist
-        pr1 = df[df['priority']==1]['proj_id'].tolist()
-        if pr1:
-            # this is optional — comment/uncomment as desired
-            # m.addConstr(gp.quicksum(x[p] for p in pr1) >= 1, name='MustOnePriority1')
-            pass
-
     # Optimize
-    m.optimize()
+    m.optimize(_solve_callback(cancel_event, x, projects, on_incumbent))
 
     # Collect best solution (and pool if explicitly requested)
     solutions = []
-    if m.Status in {GRB.OPTIMAL, GRB.SUBOPTIMAL, GRB.TIME_LIMIT}:
+    if m.Status in {GRB.OPTIMAL, GRB.SUBOPTIMAL, GRB.TIME_LIMIT, GRB.INTERRUPTED} and m.SolCount > 0:
         # ONLY read pool solutions if user explicitly requested them (pool_solutions > 0)
         if pool_solutions and pool_solutions > 0 and getattr(m, 'SolCount', 0) > 0:
             # Deterministically read up to pool_solutions solutions from the pool
             avail = int(getattr(m, 'SolCount', 0))
             take = int(min(avail, pool_solutions))
 
-            # Get all pool objective values at once using getAttr
-            try:
-                pool_objs = m.getAttr(GRB.Attr.PoolObjVal, m.getVars())
-            except Exception:
-                pool_objs = None
-            
-            # If that didn't work, try via a list comprehension after setting SolutionNumber
-            if pool_objs is None or not isinstance(pool_objs, (list, tuple)):
-                pool_objs = []
-                for s in range(take):
-                    try:
-                        m.setParam('SolutionNumber', s)
-                        obj = m.PoolObjVal if hasattr(m, 'PoolObjVal') else m.ObjVal
-                        pool_objs.append(obj)
-                    except Exception:
-                        pool_objs.append(m.ObjVal)
-
             for s in range(take):
-                # Set current solution number for Gurobi to read from pool
-                try:
-                    m.setParam('SolutionNumber', s)
-                except Exception:
-                    try:
-                        m.Params.SolutionNumber = s
-                    except Exception:
-                        pass
-
-                # Read variable values for this pool solution using getAttr with SolutionNumber
-                sel = []
-                try:
-                    # Try to read X values for this specific solution
-                    var_vals = m.getAttr('X', m.getVars())
-                    for var, val in zip(m.getVars(), var_vals):
-                        if val > 0.5:
-                            # Extract project ID from var name (handle 'x_P01' or 'x[P01]' formats)
-                            vname = var.VarName
-                            if 'P' in vname:
-                                proj_id = vname.split('P')[-1].replace(']', '').replace('_', '')
-                                sel.append('P' + proj_id)
-                except Exception:
-                    # Fallback: read individual variables
-                    for p in projects:
-                        var = x[p]
-                        val = None
-                        # Try Xn first (pool solution value)
-                        if hasattr(var, 'Xn'):
-                            try:
-                                val = var.Xn
-                            except Exception:
-                                val = None
-                        # Fall back to X
-                        if val is None:
-                            try:
-                                val = var.X
-                            except Exception:
-                                val = 0
-                        if val is not None and val > 0.5:
-                            sel.append(p)
-
-                # Read objective value for this pool solution
-                obj = pool_objs[s] if s < len(pool_objs) else m.ObjVal
-
-                solutions.append({'sol_no': s, 'selected': sel, 'obj': float(obj)})
+                # Select pool solution s; PoolObjVal and Xn then refer to it
+                m.Params.SolutionNumber = s
+
+                # Read variable values for this pool solution in one bulk call (x[i] <-> projects[i])
+                vals = x.Xn
+                sel = [projects[i] for i in np.nonzero(vals > 0.5)[0]]
+
+                solutions.append({'sol_no': s, 'selected': sel, 'obj': float(m.PoolObjVal)})
 
         else:
             # Single best solution ONLY (when pool_solutions == 0 or no solutions found)
-            sel = [p for p in projects if x[p].X > 0.5]
+            sel = [p for p, val in zip(projects, x.X) if val > 0.5]
             solutions.append({'sol_no': 0, 'selected': sel, 'obj': float(m.ObjVal)})
 
     # Deduplicate solutions that have identical selected sets (preserve order)
     unique = []
     seen = set()
     for sol in solutions:
-        key = tuple(sorted(sol.get('selected', [])))
+        key = frozenset(sol.get('selected', ()))
         if key in seen:
             continue
         seen.add(key)
@@ -273,7 +408,8 @@ def build_solve(df,
 
     # FALLBACK: If user requested pool solutions but Gurobi found too few,
     # automatically run K-best enumeration to provide the requested alternatives
-    if pool_solutions and pool_solutions > 0 and len(unique) < pool_solutions:
+    cancelled = cancel_event is not None and cancel_event.is_set()
+    if pool_solutions and pool_solutions > 0 and len(unique) < pool_solutions and not cancelled:
         fallback_k = pool_solutions
         fallback_res = enumerate_k_best(
             df,
@@ -286,7 +422,11 @@ def build_solve(df,
             time_limit=time_limit,
             k=fallback_k,
             time_per_solve=time_limit if time_limit else 30,
-            multi_crit_alpha=multi_crit_alpha
+            multi_crit_alpha=multi_crit_alpha,
+            enforce_priority_one=enforce_priority_one,
+            threads=threads,
+            method=method,
+            cancel_event=cancel_event
         )
         # Replace with enumeration results (they are complete and distinct)
         enum_sols = fallback_res.get('solutions', [])
@@ -306,12 +446,17 @@ def enumerate_k_best(df,
                      time_limit=None,
                      k=3,
                      time_per_solve=None,
-                     multi_crit_alpha=1.0):
+                     multi_crit_alpha=1.0,
+                     enforce_priority_one=False,
+                     threads=None,
+                     method=None,
+                     cancel_event=None):
     """Enumerate up to `k` distinct best solutions by repeatedly solving and
     adding an exclusion constraint forbidding previously found selections.
 
-    This is a wrapper that repeatedly calls `build_solve` and does not alter
-    the core model logic; it only adds exclusion constraints between iterations.
+    The model is built once (`_build_model`) and re-optimized after each new
+    exclusion row, so Gurobi keeps its environment and can reuse the previous
+    search instead of starting from scratch every iteration.
     Returns a dict with key 'solutions' containing up to k solution dicts.
     """
     found = []
@@ -319,27 +464,30 @@ def enumerate_k_best(df,
     # time_per_solve allows shorter solves per enumeration if desired
     per_solve = time_per_solve if time_per_solve is not None else time_limit
 
+    m, x, projects = _build_model(df, budget,
+                                  resource_caps=resource_caps,
+                                  groups_exclusive=groups_exclusive,
+                                  dependencies=dependencies,
+                                  region_min_max=region_min_max,
+                                  K=K,
+                                  multi_crit_alpha=multi_crit_alpha,
+                                  enforce_priority_one=enforce_priority_one)
+    if per_solve is not None:
+        m.Params.TimeLimit = per_solve
+    if threads is not None:
+        m.Params.Threads = threads
+    if method is not None:
+        m.Params.Method = method
+
+    callback = _solve_callback(cancel_event)
     for i in range(k):
-        res = build_solve(df,
-                          budget=budget,
-                          resource_caps=resource_caps,
-                          groups_exclusive=groups_exclusive,
-                          dependencies=dependencies,
-                          region_min_max=region_min_max,
-                          K=K,
-                          time_limit=per_solve,
-                          pool_solutions=0,
-                          multi_crit_alpha=multi_crit_alpha,
-                          exclude_sets=exclude_sets)
-
-        sols = res.get('solutions', [])
-        if not sols:
+        m.optimize(callback)
+        if m.Status not in {GRB.OPTIMAL, GRB.SUBOPTIMAL, GRB.TIME_LIMIT} or m.SolCount == 0:
             break
 
-        best = sols[0]
-        # Ensure sol_no is sequential within the enumeration (avoid repeated 0s)
-        entry = dict(best)
-        entry['sol_no'] = i
+        idx = np.flatnonzero(x.X > 0.5)
+        sel = [projects[j] for j in idx]
+        entry = {'sol_no': i, 'selected': sel, 'obj': float(m.ObjVal)}
 
         # attach some metadata about the iteration
         entry['_iteration'] = i
@@ -347,11 +495,14 @@ def enumerate_k_best(df,
         # append found solution and then exclude it in next iterations
         found.append(entry)
 
-        sel = best.get('selected', [])
         if not sel:
             break
         exclude_sets.append(sel)
+        # forbid this exact selection: at most len(sel)-1 of its projects together
+        m.addConstr(x[idx].sum() <= len(idx) - 1, name=f'Exclude_{i}')
 
+    # solutions are plain Python data by now: free Gurobi's native memory right away
+    m.dispose()
     return {'solutions': found}
 
 # ---------------------------
@@ -367,22 +518,9 @@ if __name__ == '__main__':
     resource_caps = {'labour': 2000, 'land': 4000}  # example capacities
     # exclusivity groups (optional) - names matching exclusive_group column
     # Build groups from exclusive_group values in df
-    groups = []
-    if 'exclusive_group' in df.columns:
-        for gname in df['exclusive_group'].unique():
-            if gname and gname.strip():
-                members = df[df['exclusive_group']==gname]['proj_id'].tolist()
-                if members:
-                    groups.append(members)
+    groups = parse_exclusive_groups(df)
     # dependencies: parse 'requires' column (semicolon separated)
-    deps = []
-    if 'requires' in df.columns:
-        for p, req in df.set_index('proj_id')['requires'].items():
-            if isinstance(req, str) and req.strip():
-                for r in req.split(';'):
-                    r = r.strip()
-                    if r:
-                        deps.append((r, p))  # (i, j) meaning j requires i
+    deps = parse_dependencies(df)
 
     # regional quotas example: require at least 1 project in RegionD, at most 6 in RegionA
     region_quotas = {'RegionD': (1, None), 'RegionA': (None, 6)}
@@ -1,36 +1,137 @@
 # src/ihm_main.py
 import sys
 import os
+from datetime import datetime
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-    QFileDialog, QMessageBox, QTableWidget, QLabel, QLineEdit, QSpinBox, QGroupBox, QTableWidgetItem,
-    QPlainTextEdit
+    QFileDialog, QMessageBox, QTableView, QLabel, QLineEdit, QSpinBox, QGroupBox,
+    QPlainTextEdit, QAbstractItemView, QAbstractItemDelegate
 )
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QColor, QFont
+from PyQt5.QtCore import Qt, QLocale, QTimer, pyqtSignal
+from PyQt5.QtGui import QColor, QDoubleValidator, QFont, QTextCursor
 
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-import matplotlib.pyplot as plt
-
-from ui_utils import df_to_qtable, qtable_to_df, load_csv_to_df, save_df_to_csv
+from ui_utils import FILE_FILTERS, PandasModel, load_df, save_df
 from solver_thread import SolverThread
+from capital_budgeting_extended import parse_dependencies, parse_exclusive_groups
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 DEFAULT_CSV = BASE_DIR / 'data' / 'projects_example.csv'
 
+# Feuilles de style construites une fois par processus (et non à chaque fenêtre/bouton)
+APP_STYLESHEET = """
+    QWidget {
+        background-color: #ecf0f1;
+        color: #2c3e50;
+        font-family: Arial;
+        font-size: 10pt;
+    }
+    QLineEdit, QSpinBox {
+        padding: 5px;
+        border: 1px solid #bdc3c7;
+        border-radius: 3px;
+        background-color: white;
+    }
+    QLineEdit:focus, QSpinBox:focus {
+        border: 2px solid #3498db;
+    }
+"""
+
+TABLE_STYLESHEET = """
+    QTableView {
+        background-color: #f5f5f5;
+        gridline-color: #cccccc;
+        border: 1px solid #ddd;
+    }
+    QTableView::item {
+        padding: 5px;
+    }
+    QHeaderView::section {
+        background-color: #4a7ba7;
+        color: white;
+        padding: 5px;
+        border: none;
+        font-weight: bold;
+    }
+"""
+
+# Mise en forme du graphique de sélection (mêmes objets réutilisés à chaque tracé)
+_TITLE_KW = dict(fontsize=11, fontweight='bold', color='#2c3e50')
+_AXLBL_KW = dict(fontsize=10, fontweight='bold')
+_BAR_KW = dict(edgecolor='#2c3e50', linewidth=1.5)
+_GRID_KW = dict(alpha=0.3, linestyle='--')
+_MESSAGE_KW = dict(ha='center', va='center', fontsize=12)
+
+
+# Couleurs des boutons par objectName : (fond, survol)
+_BUTTON_COLORS = {
+    'import': ("#3498db", "#2980b9"),
+    'save': ("#27ae60", "#2980b9"),
+    'add': ("#f39c12", "#2980b9"),
+    'delete': ("#e74c3c", "#2980b9"),
+    'validate': ("#9b59b6", "#2980b9"),
+    'solve': ("#16a085", "#138d75"),
+    'stop': ("#c0392b", "#a93226"),
+    'prev_sol': ("#95a5a6", "#2980b9"),
+    'next_sol': ("#95a5a6", "#2980b9"),
+}
+
+
+def _button_css(colors):
+    # Un sélecteur #id l'emporte sur une pseudo-classe seule : hover/disabled sont
+    # donc déclinés par id, et les boîtes de dialogue (sans objectName) ne sont pas touchées
+    def sel(suffix=''):
+        return ', '.join(f'QPushButton#{name}{suffix}' for name in colors)
+    rules = [f"""
+    {sel()} {{
+        color: white;
+        border: none;
+        border-radius: 4px;
+        padding: 8px 12px;
+        font-weight: bold;
+        font-size: 9pt;
+    }}"""]
+    rules += [f"\n    QPushButton#{name} {{ background-color: {bg}; }}"
+              for name, (bg, _) in colors.items()]
+    rules += [f"\n    QPushButton#{name}:hover {{ background-color: {hover}; }}"
+              for name, (_, hover) in colors.items()]
+    rules.append(f"""
+    {sel(':pressed')} {{
+        padding: 10px 10px 6px 14px;
+    }}
+    {sel(':disabled')} {{
+        background-color: #95a5a6;
+        color: #7f8c8d;
+    }}
+""")
+    return ''.join(rules)
+
+
+_BUTTON_CSS = _button_css(_BUTTON_COLORS)
+
+
 class MainWindow(QWidget):
+    # log() passe par ce signal : appelé depuis un autre thread, Qt met l'ajout en
+    # file d'attente sur le thread de l'IHM
+    log_signal = pyqtSignal(str)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Projet-RO — Capital Budgeting (IHM)")
         self.resize(1200, 750)
 
-        # DataFrame en mémoire
+        # DataFrame en mémoire (partagé avec le modèle de la table, pas de copie)
         self.df = pd.DataFrame()
+        # cible de l'auto-save : uniquement un fichier choisi via "Enregistrer CSV",
+        # jamais le fichier importé (qui n'est pas réécrit à l'insu de l'utilisateur)
+        self.csv_path = None
         # solver thread reference
         self.solver_thread = None
+        # modèle Gurobi réutilisé tant que les données/contraintes ne changent pas (cf. build_solve)
+        self._model_cache = {}
         self.last_solution = None
         # Pool solutions storage and navigation
         self.pool_solutions = []
@@ -44,25 +145,31 @@ class MainWindow(QWidget):
         top_layout = QHBoxLayout()
         bottom_layout = QHBoxLayout()
 
-        # Table widget (centre)
-        self.table = QTableWidget()
-        self.table.setStyleSheet("""
-            QTableWidget {
-                background-color: #f5f5f5;
-                gridline-color: #cccccc;
-                border: 1px solid #ddd;
-            }
-            QTableWidget::item {
-                padding: 5px;
-            }
-            QHeaderView::section {
-                background-color: #4a7ba7;
-                color: white;
-                padding: 5px;
-                border: none;
-                font-weight: bold;
-            }
-        """)
+        # Table view (centre) : lit les cellules directement depuis self.df
+        self.model = PandasModel(self.df)
+        self.model.dataChanged.connect(self._auto_save_cell)
+        # auto-save différé : une rafale d'edits donne une seule écriture du fichier
+        self._autosave_timer = QTimer(self)
+        self._autosave_timer.setSingleShot(True)
+        self._autosave_timer.timeout.connect(self._flush_autosave)
+        self._autosave_edits = 0
+        self.model.invalidValue.connect(self._on_invalid_value)
+        # toute modification des données rend le graphique courant obsolète
+        for sig in (self.model.dataChanged, self.model.modelReset,
+                    self.model.rowsInserted, self.model.rowsRemoved):
+            sig.connect(self._invalidate_plot)
+        # exclusivités / dépendances lues depuis la table, recalculées seulement après
+        # un changement de lignes ou d'une cellule proj_id / requires / exclusive_group
+        self._structure = None
+        self.model.dataChanged.connect(self._on_cells_changed)
+        for sig in (self.model.modelReset, self.model.rowsInserted, self.model.rowsRemoved):
+            sig.connect(self._invalidate_structure)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.table.setStyleSheet(TABLE_STYLESHEET)
+        # déclencheurs d'édition normaux, coupés pendant une résolution (cf. on_solve)
+        self._edit_triggers = self.table.editTriggers()
         main_layout.addWidget(self.table, stretch=6)
 
         # Left: Data buttons
@@ -72,29 +179,31 @@ class MainWindow(QWidget):
         left_label.setStyleSheet("color: #2c3e50;")
         left_v.addWidget(left_label)
 
-        btn_import = QPushButton("Importer CSV")
-        btn_import.clicked.connect(self.on_import)
-        btn_import.setStyleSheet(self._button_style("#3498db"))
-        left_v.addWidget(btn_import)
+        self.btn_import = QPushButton("Importer CSV")
+        self.btn_import.clicked.connect(self.on_import)
+        self.btn_import.setObjectName("import")
+        left_v.addWidget(self.btn_import)
 
         btn_save = QPushButton("Enregistrer CSV")
         btn_save.clicked.connect(self.on_save)
-        btn_save.setStyleSheet(self._button_style("#27ae60"))
+        btn_save.setObjectName("save")
+        btn_save.setToolTip("Enregistre la table ; les modifications suivantes sont "
+                            "ensuite sauvegardées automatiquement dans ce fichier")
         left_v.addWidget(btn_save)
 
-        btn_add = QPushButton(" Ajouter ligne")
-        btn_add.clicked.connect(self.on_add_row)
-        btn_add.setStyleSheet(self._button_style("#f39c12"))
-        left_v.addWidget(btn_add)
+        self.btn_add = QPushButton(" Ajouter ligne")
+        self.btn_add.clicked.connect(self.on_add_row)
+        self.btn_add.setObjectName("add")
+        left_v.addWidget(self.btn_add)
 
-        btn_delete = QPushButton("Supprimer ligne")
-        btn_delete.clicked.connect(self.on_delete_row)
-        btn_delete.setStyleSheet(self._button_style("#e74c3c"))
-        left_v.addWidget(btn_delete)
+        self.btn_delete = QPushButton("Supprimer ligne")
+        self.btn_delete.clicked.connect(self.on_delete_row)
+        self.btn_delete.setObjectName("delete")
+        left_v.addWidget(self.btn_delete)
 
         btn_validate = QPushButton("✓ Validation rapide")
         btn_validate.clicked.connect(self.on_validate)
-        btn_validate.setStyleSheet(self._button_style("#9b59b6"))
+        btn_validate.setObjectName("validate")
         left_v.addWidget(btn_validate)
 
         left_v.addStretch()
@@ -129,6 +238,13 @@ class MainWindow(QWidget):
         budget_label.setStyleSheet("color: #34495e; font-weight: bold;")
         self.budget_input = QLineEdit()
         self.budget_input.setPlaceholderText("2000000")
+        # le validateur refuse la saisie non numérique; le budget est converti une
+        # fois à chaque modification (self._budget, None si la saisie est incomplète)
+        budget_validator = QDoubleValidator(0.0, 1e15, 2, self)
+        budget_validator.setLocale(QLocale.c())  # point décimal, comme float()
+        self.budget_input.setValidator(budget_validator)
+        self._budget = 2000000.0
+        self.budget_input.textChanged.connect(self._on_budget_changed)
         self.budget_input.setStyleSheet("QLineEdit { padding: 5px; border: 1px solid #bdc3c7; border-radius: 3px; }")
         budget_layout.addWidget(budget_label)
         budget_layout.addWidget(self.budget_input)
@@ -159,7 +275,7 @@ class MainWindow(QWidget):
         # Buttons Solve / Stop
         self.btn_solve = QPushButton(" Optimiser")
         self.btn_solve.clicked.connect(self.on_solve)
-        self.btn_solve.setStyleSheet(self._button_style("#16a085", hover="#138d75"))
+        self.btn_solve.setObjectName("solve")
         self.btn_solve.setMinimumHeight(40)
         self.btn_solve.setFont(QFont("Arial", 10, QFont.Bold))
         mid_v.addWidget(self.btn_solve)
@@ -167,7 +283,7 @@ class MainWindow(QWidget):
         self.btn_stop = QPushButton(" Annuler (stop)")
         self.btn_stop.clicked.connect(self.on_stop)
         self.btn_stop.setEnabled(False)
-        self.btn_stop.setStyleSheet(self._button_style("#c0392b", hover="#a93226"))
+        self.btn_stop.setObjectName("stop")
         self.btn_stop.setMinimumHeight(40)
         self.btn_stop.setFont(QFont("Arial", 10, QFont.Bold))
         mid_v.addWidget(self.btn_stop)
@@ -200,7 +316,7 @@ class MainWindow(QWidget):
         self.btn_prev_sol = QPushButton("◄ Précédent")
         self.btn_prev_sol.clicked.connect(self.on_prev_solution)
         self.btn_prev_sol.setEnabled(False)
-        self.btn_prev_sol.setStyleSheet(self._button_style("#95a5a6"))
+        self.btn_prev_sol.setObjectName("prev_sol")
         nav_layout.addWidget(self.btn_prev_sol)
 
         self.sol_counter_label = QLabel("Sol: 1/1")
@@ -211,14 +327,21 @@ class MainWindow(QWidget):
         self.btn_next_sol = QPushButton("Suivant ►")
         self.btn_next_sol.clicked.connect(self.on_next_solution)
         self.btn_next_sol.setEnabled(False)
-        self.btn_next_sol.setStyleSheet(self._button_style("#95a5a6"))
+        self.btn_next_sol.setObjectName("next_sol")
         nav_layout.addWidget(self.btn_next_sol)
         right_v.addLayout(nav_layout)
 
-        # matplotlib canvas
-        self.fig, self.ax = plt.subplots(figsize=(4, 3))
-        self.fig.patch.set_facecolor('#f5f5f5')
-        self.canvas = FigureCanvas(self.fig)
+        # matplotlib canvas: créé au premier tracé (_ensure_canvas), pour ne pas
+        # payer l'import de matplotlib au démarrage
+        self.fig = self.ax = self.canvas = None
+        # barres du dernier graphique, réutilisées tant que les libellés ne changent pas
+        self._bars = None
+        self._bars_key = None
+        # sélection actuellement tracée : re-tracer la même sélection ne fait rien
+        self._last_plot_key = None
+        self._plot_placeholder = QLabel("(graphique apparaîtra ici)")
+        self._plot_placeholder.setAlignment(Qt.AlignCenter)
+        self._plot_placeholder.setStyleSheet("color: #95a5a6;")
         self.solution_list = QPlainTextEdit()
 
         self.solution_list.setReadOnly(True)
@@ -249,6 +372,11 @@ class MainWindow(QWidget):
         self.log_widget = QPlainTextEdit()
         self.log_widget.setReadOnly(True)
         self.log_widget.setFixedHeight(180)
+        # Qt supprime lui-même les plus anciennes lignes au-delà de cette limite
+        self.log_widget.document().setMaximumBlockCount(400)
+        # messages en attente, écrits en un seul append (voir _flush_log)
+        self._log_buf = []
+        self.log_signal.connect(self._append_log)
         self.log_widget.setStyleSheet("""
             QPlainTextEdit {
                 background-color: #2c3e50;
@@ -266,9 +394,10 @@ class MainWindow(QWidget):
         # Quick run buttons
         # btn_show_selected = QPushButton(" Afficher sélection")
         # btn_show_selected.clicked.connect(self.on_show_selected)
-        # btn_show_selected.setStyleSheet(self._button_style("#3498db"))
+        # btn_show_selected.setObjectName("import")
         # bottom_right.addWidget(btn_show_selected)
-        bottom_right.addWidget(self.canvas)
+        bottom_right.addWidget(self._plot_placeholder)
+        self._plot_layout = bottom_right
         bottom_layout.addLayout(bottom_right, stretch=1)
 
         main_layout.addLayout(bottom_layout, stretch=1)
@@ -278,72 +407,57 @@ class MainWindow(QWidget):
 
     def apply_stylesheet(self):
         """Apply global stylesheet for the application."""
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #ecf0f1;
-                color: #2c3e50;
-                font-family: Arial;
-                font-size: 10pt;
-            }
-            QLineEdit, QSpinBox {
-                padding: 5px;
-                border: 1px solid #bdc3c7;
-                border-radius: 3px;
-                background-color: white;
-            }
-            QLineEdit:focus, QSpinBox:focus {
-                border: 2px solid #3498db;
-            }
-        """)
+        self.setStyleSheet(APP_STYLESHEET + _BUTTON_CSS)
 
-    def _button_style(self, bg_color="#3498db", hover="#2980b9"):
-        """Generate button stylesheet with colors."""
-        return f"""
-            QPushButton {{
-                background-color: {bg_color};
-                color: white;
-                border: none;
-                border-radius: 4px;
-                padding: 8px 12px;
-                font-weight: bold;
-                font-size: 9pt;
-            }}
-            QPushButton:hover {{
-                background-color: {hover};
-            }}
-            QPushButton:pressed {{
-                padding: 10px 10px 6px 14px;
-            }}
-            QPushButton:disabled {{
-                background-color: #95a5a6;
-                color: #7f8c8d;
-            }}
-        """
+    def _on_budget_changed(self, text):
+        text = text.strip()
+        try:
+            self._budget = float(text) if text else 2000000.0
+        except ValueError:
+            self._budget = None
 
     # --------- Data operations ----------
+    def _commit_pending_edit(self, close=False):
+        """Écrit dans self.df une cellule encore en cours d'édition (et ferme
+        l'éditeur si `close`)."""
+        editor = QApplication.focusWidget()
+        if editor is not None and self.table.isAncestorOf(editor):
+            self.table.commitData(editor)
+            if close:
+                self.table.closeEditor(editor, QAbstractItemDelegate.NoHint)
+
     def load_csv(self, path):
+        # écrire d'abord les edits en attente dans l'ancien fichier
+        self._flush_autosave()
         try:
-            df = load_csv_to_df(path)
+            df = load_df(path)
             self.df = df
-            df_to_qtable(self.table, df)
-            # === AJOUT : activer sauvegarde automatique après edition ===
-            self.table.itemChanged.connect(self._auto_save_cell)
-            self.log(f"CSV chargé : {path}")
+            # un seul reset du modèle, et pas de repaint intermédiaire pendant le redimensionnement
+            self.table.setUpdatesEnabled(False)
+            try:
+                self.model.set_dataframe(df)
+                self.table.resizeColumnsToContents()
+            finally:
+                self.table.setUpdatesEnabled(True)
+            # le fichier importé n'est pas une cible d'auto-save (voir _auto_save_cell)
+            self.csv_path = None
+            self.log(f"CSV chargé : {path} (auto-save désactivé jusqu'à « Enregistrer CSV »)")
         except Exception as e:
             self.log(f"Erreur chargement CSV: {e}")
             QMessageBox.warning(self, "Erreur", f"Impossible de charger CSV: {e}")
 
     def on_import(self):
-        path, _ = QFileDialog.getOpenFileName(self, "Ouvrir CSV", str(BASE_DIR / 'data'), "CSV Files (*.csv)")
+        path, _ = QFileDialog.getOpenFileName(self, "Ouvrir CSV", str(BASE_DIR / 'data'), FILE_FILTERS)
         if path:
             self.load_csv(path)
 
     def on_save(self):
         # sauvegarde vers le même fichier ou Save As
-        path, _ = QFileDialog.getSaveFileName(self, "Enregistrer CSV", str(BASE_DIR / 'data' / 'projects_example.csv'), "CSV Files (*.csv)")
+        path, _ = QFileDialog.getSaveFileName(self, "Enregistrer CSV", str(BASE_DIR / 'data' / 'projects_example.csv'), FILE_FILTERS)
         if path:
-            df = qtable_to_df(self.table)
-                        # === AJOUT : validation erreur utilisateur ===
+            self._commit_pending_edit()
+            df = self.df
+            # === AJOUT : validation erreur utilisateur ===
             mandatory = ["proj_id", "cost", "benefit"]
             for m in mandatory:
                 if m not in df.columns:
@@ -362,44 +476,52 @@ class MainWindow(QWidget):
                             f"Valeurs non numériques dans colonne '{c}'."
                         )
                         return
-            save_df_to_csv(df, path)
-            self.log(f"CSV enregistré : {path}")
+            try:
+                save_df(df, path)
+            except Exception as e:
+                self.log(f"Erreur enregistrement: {e}")
+                QMessageBox.warning(self, "Erreur", f"Impossible d'enregistrer: {e}")
+                return
+            # fichier choisi par l'utilisateur : il devient la cible de l'auto-save,
+            # et les edits en attente sont déjà dans ce qui vient d'être écrit
+            self.csv_path = path
+            self._autosave_timer.stop()
+            self._autosave_edits = 0
+            self.log(f"CSV enregistré : {path} (auto-save activé vers ce fichier)")
 
     def on_add_row(self):
-        r = self.table.rowCount()
-        self.table.insertRow(r)
+        if self.df.columns.empty:
+            self.log("Aucune colonne : importez d'abord un CSV")
+            return
+        r = len(self.df.index)
         # Optionnel: remplir la colonne proj_id avec Pxx automatique
-        headers = [self.table.horizontalHeaderItem(c).text() for c in range(self.table.columnCount())]
-        if 'proj_id' in headers:
-            cidx = headers.index('proj_id')
+        values = {}
+        if 'proj_id' in self.df.columns:
             # génère Pnn
-            new_id = f"P{r+1:02d}"
-            self.table.setItem(r, cidx, QTableWidgetItem(new_id))
+            values['proj_id'] = f"P{r+1:02d}"
+        self.model.insert_row(values)
         self.log("Ligne ajoutée (édition disponible)")
 
     def on_delete_row(self):
-        r = self.table.currentRow()
+        r = self.table.currentIndex().row()
         if r >= 0:
-            self.table.removeRow(r)
+            self.model.remove_row(r)
             self.log(f"Ligne {r} supprimée")
         else:
             self.log("Aucune ligne sélectionnée pour suppression")
 
     def on_validate(self):
         # simple validation (like ton script)
-        df = qtable_to_df(self.table)
+        self._commit_pending_edit()
+        df = self.df
         errors = []
-        if df['proj_id'].duplicated().any():
+        if not df['proj_id'].is_unique:
             errors.append("proj_id duplicates found")
-        numeric_cols = ['cost', 'benefit']
-        for c in numeric_cols:
-            if c in df.columns:
-                try:
-                    bad = (pd.to_numeric(df[c], errors='coerce') <= 0).any()
-                    if bad:
-                        errors.append(f"Some values in {c} <= 0 or invalid")
-                except Exception:
-                    errors.append(f"Error parsing column {c}")
+        numeric_cols = [c for c in ['cost', 'benefit'] if c in df.columns]
+        # une seule réduction sur toutes les colonnes numériques (coerce : ne lève pas)
+        num = df[numeric_cols].apply(pd.to_numeric, errors='coerce')
+        bad = (num.le(0) | num.isna()).any()
+        errors += [f"Some values in {c} <= 0 or invalid" for c, is_bad in bad.items() if is_bad]
         if not errors:
             QMessageBox.information(self, "Validation", "Validation rapide passée")
             self.log("Validation: OK")
@@ -409,12 +531,13 @@ class MainWindow(QWidget):
 
     # ---------- Solver ----------
     def on_solve(self):
-        # récupère df depuis table (pour prendre edits)
-        df = qtable_to_df(self.table)
+        # la table édite self.df directement : il contient déjà les edits (l'éditeur
+        # ouvert est fermé, la table restant en lecture seule pendant la résolution)
+        self._commit_pending_edit(close=True)
+        df = self.df
         # paramètres simples à lire depuis inputs
-        try:
-            budget = float(self.budget_input.text()) if self.budget_input.text().strip() else 2000000.0
-        except ValueError:
+        budget = self._budget
+        if budget is None:
             QMessageBox.warning(self, "Erreur", "Budget invalide")
             return
         time_limit = int(self.timelimit_input.value())
@@ -428,25 +551,13 @@ class MainWindow(QWidget):
         if 'land' in df.columns:
             resource_caps['land'] = 4000
 
-        # groups_exclusive : construit automatiquement depuis exclusive_group column si présente
-        groups = []
-        if 'exclusive_group' in df.columns:
-            for gname in df['exclusive_group'].unique():
-                if gname and str(gname).strip():
-                    members = df[df['exclusive_group'] == gname]['proj_id'].tolist()
-                    if members:
-                        groups.append(members)
-        # dependencies : parse 'requires' column like (i,j) pairs
-        deps = []
-        if 'requires' in df.columns:
-            for p, req in df.set_index('proj_id')['requires'].items():
-                if isinstance(req, str) and req.strip():
-                    for r in req.split(';'):
-                        r = r.strip()
-                        if r:
-                            deps.append((r, p))
-
-        # désactiver bouton solve, activer stop
+        # groups_exclusive / dependencies : depuis les colonnes exclusive_group / requires
+        groups, deps = self._structural_constraints()
+
+        # désactiver bouton solve, activer stop ; table en lecture seule et sans
+        # import / ajout / suppression de lignes jusqu'à la fin de la résolution,
+        # pour que le solveur et la table restent sur les mêmes données
+        self._set_table_locked(True)
         self.btn_solve.setEnabled(False)
         self.btn_stop.setEnabled(True)
         self.log("Lancement du solver...")
@@ -462,59 +573,85 @@ class MainWindow(QWidget):
                                           time_limit=time_limit,
                                           pool_solutions=pool,
                                           pool_gap=0.05,
-                                          multi_crit_alpha=1.0)
+                                          multi_crit_alpha=1.0,
+                                          model_cache=self._model_cache)
+        self.solver_thread.incumbent.connect(self._on_incumbent)
         self.solver_thread.finished.connect(self.on_solver_finished)
         self.solver_thread.error.connect(self.on_solver_error)
         self.solver_thread.start()
-    def _auto_save_cell(self, item):
-        """Sauvegarde automatique après modification d’une cellule."""
-        try:
-            row = item.row()
-            col = item.column()
-            new_val = item.text()
-
-            df = qtable_to_df(self.table)
-            colname = df.columns[col]
-
-            # Vérification : si la colonne doit être numérique
-            if colname in ["cost", "benefit", "labour", "land", "priority", "social_score"]:
-                float(new_val)  # lève ValueError si invalide
+    def _structural_constraints(self):
+        """(groups_exclusive, dependencies) parsed from the table, cached until
+        `_invalidate_structure` runs."""
+        if self._structure is None:
+            self._structure = (parse_exclusive_groups(self.df), parse_dependencies(self.df))
+        return self._structure
+
+    def _invalidate_structure(self, *args):
+        self._structure = None
+
+    def _on_cells_changed(self, top_left, bottom_right):
+        cols = self.df.columns[top_left.column():bottom_right.column() + 1]
+        if cols.isin(['proj_id', 'requires', 'exclusive_group']).any():
+            self._structure = None
+
+    def _auto_save_cell(self, top_left, bottom_right):
+        """Sauvegarde automatique après modification d’une cellule (500 ms après le dernier edit),
+        seulement vers le fichier choisi par "Enregistrer CSV" (csv_path)."""
+        if self.csv_path:
+            self._autosave_edits += 1
+            self._autosave_timer.start(500)
+
+    def _flush_autosave(self):
+        self._autosave_timer.stop()
+        if not self._autosave_edits:
+            return
+        n, self._autosave_edits = self._autosave_edits, 0
+        save_df(self.df, self.csv_path)
+        self.log(f"Auto-save: {n} modification(s) enregistrée(s)")
 
-            # Mise à jour DataFrame et sauvegarde
-            df.at[row, colname] = new_val
-            if self.df is not None:
-                self.df = df
+    def closeEvent(self, event):
+        self._flush_autosave()
+        super().closeEvent(event)
 
-            if self.csv_path:
-                df.to_csv(self.csv_path, index=False)
-                self.log(f"Auto-save: colonne {colname}, ligne {row}")
+    def _on_invalid_value(self, colname):
+        # le modèle a refusé la saisie : l'ancienne valeur reste affichée
+        QMessageBox.warning(self, "Erreur", f"Valeur invalide dans '{colname}' : doit être numérique.")
 
-        except ValueError:
-            QMessageBox.warning(self, "Erreur", f"Valeur invalide dans '{colname}' : doit être numérique.")
-            # Restaurer ancienne valeur
-            old_df = qtable_to_df(self.table)
-            item.setText(str(old_df.iloc[row, col]))
+    def _set_table_locked(self, locked):
+        # pendant la résolution : ni édition de cellule, ni changement de lignes
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers if locked
+                                   else self._edit_triggers)
+        for btn in (self.btn_import, self.btn_add, self.btn_delete):
+            btn.setEnabled(not locked)
 
     def on_stop(self):
-        # Tentative d'arrêt: pour gurobi, on peut définir un flag (non trivial),
-        # ici on arrête le thread (ne garantit pas l'arrêt du solveur natif)
+        # Arrêt coopératif : Gurobi s'interrompt au prochain callback et le thread
+        # émet son résultat normalement (on_solver_finished réactive les boutons)
         if self.solver_thread and self.solver_thread.isRunning():
-            # arrête le thread proprement si possible
-            try:
-                self.solver_thread.terminate()
-                self.solver_thread.wait(1000)
-                self.log("Thread solver arrêté manuellement (terminate).")
-            except Exception as e:
-                self.log(f"Erreur arrêt thread: {e}")
-        self.btn_solve.setEnabled(True)
-        self.btn_stop.setEnabled(False)
+            self.solver_thread.cancel()
+            self.btn_stop.setEnabled(False)
+            self.log("Arrêt du solveur demandé...")
+        else:
+            self.btn_solve.setEnabled(True)
+            self.btn_stop.setEnabled(False)
+
+    def _on_incumbent(self, sol):
+        # meilleure solution courante, affichée pendant la recherche ; remplacée par
+        # le résultat final (pool compris) dans on_solver_finished
+        self.pool_solutions = [sol]
+        self.current_sol_idx = 0
+        self._update_solution_display()
+        self.log(f"Nouvelle meilleure solution : obj = {sol['obj']:.2f}")
 
     def on_solver_finished(self, payload):
         """Handle solver completion with improved result display."""
         self.btn_solve.setEnabled(True)
         self.btn_stop.setEnabled(False)
+        self._set_table_locked(False)
         
         if payload.get('status') == 'ok':
+            if payload.get('cancelled'):
+                self.log("Solveur interrompu : meilleure solution trouvée jusque-là.")
             res = payload.get('result', {})
             sols = res.get('solutions', [])
             
@@ -533,12 +670,8 @@ class MainWindow(QWidget):
                 self.pool_solutions = []
                 self.current_sol_idx = 0
                 # Clear plot
-                self.ax.clear()
-                self.ax.text(0.5, 0.5, 'Aucune solution', ha='center', va='center', fontsize=12, color='#e74c3c')
-                self.ax.set_xlim(0, 1)
-                self.ax.set_ylim(0, 1)
-                self.ax.axis('off')
-                self.canvas.draw()
+                self._invalidate_plot()
+                self._plot_message('Aucune solution', color='#e74c3c')
         else:
             status_msg = payload.get('status', 'unknown')
             self.result_label.setText(f"❌ Erreur: {status_msg}")
@@ -563,12 +696,11 @@ class MainWindow(QWidget):
         result_text = f" Solution {self.current_sol_idx + 1}/{len(self.pool_solutions)}\nObj: {obj:.2f} | Projets: {num_projects}"
         self.result_label.setText(result_text)
         
-        # Update solution list
-        self.solution_list.clear()
-        self.solution_list.appendPlainText("=== Projets sélectionnés ===")
-        for p in selected:
-            self.solution_list.appendPlainText(f"- {p}")
-        self.solution_list.appendPlainText(f"\nObjectif total : {obj:.2f}")
+        # Update solution list (un seul setPlainText plutôt qu'un append par projet)
+        lines = ["=== Projets sélectionnés ==="]
+        lines += [f"- {p}" for p in selected]
+        lines.append(f"\nObjectif total : {obj:.2f}")
+        self.solution_list.setPlainText("\n".join(lines))
         
         # Update solution counter
         self.sol_counter_label.setText(f"Sol: {self.current_sol_idx + 1}/{len(self.pool_solutions)}")
@@ -598,48 +730,113 @@ class MainWindow(QWidget):
     def on_solver_error(self, errstr):
         self.btn_solve.setEnabled(True)
         self.btn_stop.setEnabled(False)
+        self._set_table_locked(False)
         QMessageBox.critical(self, "Solver error", errstr)
         self.log("Solver error: " + errstr)
         self.solver_thread = None
 
+    def _ensure_canvas(self):
+        """Create the matplotlib figure/canvas on first use, in place of the placeholder."""
+        if self.canvas is not None:
+            return
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+        from matplotlib.figure import Figure
+
+        self.fig = Figure(figsize=(4, 3))
+        self.ax = self.fig.add_subplot()
+        self.fig.patch.set_facecolor('#f5f5f5')
+        self.canvas = FigureCanvas(self.fig)
+        # blitting : fond de l'axe (sans les barres, 'animated') capturé après chaque rendu complet
+        self._plot_bg = None
+        self.canvas.mpl_connect('draw_event', self._on_canvas_draw)
+        self._plot_layout.replaceWidget(self._plot_placeholder, self.canvas)
+        self._plot_placeholder.deleteLater()
+        self._plot_placeholder = None
+
+    def _invalidate_plot(self, *args):
+        self._last_plot_key = None
+
     def plot_selection(self, selected):
         """Plot selected projects with improved aesthetics."""
-        self.ax.clear()
-        
+        key = frozenset(selected)
+        if key == self._last_plot_key:
+            return
+        self._last_plot_key = key
+
         if not selected:
-            self.ax.text(0.5, 0.5, 'Aucune sélection', ha='center', va='center', 
-                        fontsize=12, color='#95a5a6')
-            self.ax.set_xlim(0, 1)
-            self.ax.set_ylim(0, 1)
-            self.ax.axis('off')
+            self._plot_message('Aucune sélection')
+            return
+
+        # Essayer d'abord un graphique par région
+        df_sel = self.df[self.df['proj_id'].isin(selected)] if 'proj_id' in self.df.columns else pd.DataFrame()
+
+        if not df_sel.empty and 'region' in df_sel.columns:
+            counts = df_sel['region'].value_counts().sort_values(ascending=True)
+            counts = counts[counts > 0]  # region catégorielle : ignorer les régions non sélectionnées
+            self._draw_bars(counts.index.astype(str).tolist(), counts.to_numpy(dtype=float),
+                            color='#3498db', xlabel='Nombre de projets', ylabel='Région',
+                            title='Répartition régionale (sélection)')
+        elif not df_sel.empty and 'benefit' in df_sel.columns:
+            # Graphique des bénéfices par projet
+            benefits = df_sel.set_index('proj_id')['benefit'].sort_values(ascending=True)
+            self._draw_bars(benefits.index.astype(str).tolist(), benefits.to_numpy(dtype=float),
+                            color='#27ae60', xlabel='Bénéfice', ylabel='Projet',
+                            title='Bénéfices des projets sélectionnés')
         else:
-            # Essayer d'abord un graphique par région
-            df_sel = self.df[self.df['proj_id'].isin(selected)] if 'proj_id' in self.df.columns else pd.DataFrame()
-            
-            if not df_sel.empty and 'region' in df_sel.columns:
-                counts = df_sel['region'].value_counts().sort_values(ascending=True)
-                counts.plot(kind='barh', ax=self.ax, color='#3498db', edgecolor='#2c3e50', linewidth=1.5)
-                self.ax.set_xlabel('Nombre de projets', fontsize=10, fontweight='bold')
-                self.ax.set_ylabel('Région', fontsize=10, fontweight='bold')
-                self.ax.set_title('Répartition régionale (sélection)', fontsize=11, fontweight='bold', color='#2c3e50')
-                self.ax.grid(axis='x', alpha=0.3, linestyle='--')
-            elif not df_sel.empty and 'benefit' in df_sel.columns:
-                # Graphique des bénéfices par projet
-                benefits = df_sel.set_index('proj_id')['benefit'].sort_values(ascending=True)
-                benefits.plot(kind='barh', ax=self.ax, color='#27ae60', edgecolor='#2c3e50', linewidth=1.5)
-                self.ax.set_xlabel('Bénéfice', fontsize=10, fontweight='bold')
-                self.ax.set_ylabel('Projet', fontsize=10, fontweight='bold')
-                self.ax.set_title('Bénéfices des projets sélectionnés', fontsize=11, fontweight='bold', color='#2c3e50')
-                self.ax.grid(axis='x', alpha=0.3, linestyle='--')
-            else:
-                self.ax.text(0.5, 0.5, 'Aucune donnée à tracer', ha='center', va='center',
-                            fontsize=12, color='#95a5a6')
-                self.ax.set_xlim(0, 1)
-                self.ax.set_ylim(0, 1)
-                self.ax.axis('off')
-        
+            self._plot_message('Aucune donnée à tracer')
+
+    def _on_canvas_draw(self, event):
+        # après un rendu complet : mémoriser le fond puis dessiner les barres par-dessus
+        self._plot_bg = self.canvas.copy_from_bbox(self.fig.bbox)
+        if self._bars is not None:
+            for bar in self._bars:
+                self.ax.draw_artist(bar)
+            self.canvas.blit(self.fig.bbox)
+
+    def _draw_bars(self, labels, values, color, xlabel, ylabel, title):
+        """Horizontal bar chart; when the same chart (title and labels) is already
+        shown, only the bar widths are updated instead of rebuilding the axes, and
+        if the x range is unchanged too, only the bars are re-blitted."""
+        self._ensure_canvas()
+        key = (title, tuple(labels))
+        xlim = (0, max(values.max(), 1.0) * 1.05)
+        rebuild = self._bars is None or key != self._bars_key
+        if not rebuild:
+            for bar, v in zip(self._bars, values):
+                bar.set_width(v)
+            if self._plot_bg is not None and tuple(self.ax.get_xlim()) == xlim:
+                self.canvas.restore_region(self._plot_bg)
+                for bar in self._bars:
+                    self.ax.draw_artist(bar)
+                self.canvas.blit(self.ax.bbox)
+                return
+        else:
+            self.ax.clear()
+            pos = np.arange(len(labels))
+            self._bars = self.ax.barh(pos, values, color=color, animated=True, **_BAR_KW)
+            self._bars_key = key
+            self.ax.set_yticks(pos)
+            self.ax.set_yticklabels(labels)
+            self.ax.set_xlabel(xlabel, **_AXLBL_KW)
+            self.ax.set_ylabel(ylabel, **_AXLBL_KW)
+            self.ax.set_title(title, **_TITLE_KW)
+            self.ax.grid(axis='x', **_GRID_KW)
+        self.ax.set_xlim(*xlim)
+        if rebuild:
+            self.fig.tight_layout()
+        self.canvas.draw_idle()
+
+    def _plot_message(self, text, color='#95a5a6'):
+        """Replace the chart with a centered message."""
+        self._ensure_canvas()
+        self.ax.clear()
+        self._bars = self._bars_key = None
+        self.ax.text(0.5, 0.5, text, color=color, **_MESSAGE_KW)
+        self.ax.set_xlim(0, 1)
+        self.ax.set_ylim(0, 1)
+        self.ax.axis('off')
         self.fig.tight_layout()
-        self.canvas.draw()
+        self.canvas.draw_idle()
 
     def on_show_selected(self):
         if hasattr(self, 'last_solution') and self.last_solution:
@@ -656,26 +853,23 @@ class MainWindow(QWidget):
     #         new = new[-5000:]
     #     self.log_label.setText(new)
     def log(self, text):
-        """Write a message in the log_widget safely."""
-        from datetime import datetime
+        """Write a message in the log_widget (thread-safe, batched within 50 ms)."""
         ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        line = f"[{ts}] {text}"
-
-        try:
-            self.log_widget.appendPlainText(line)
+        self.log_signal.emit(f"[{ts}] {text}")
 
-            # limiter la taille
-            content = self.log_widget.toPlainText()
-            if len(content) > 20000:
-                trimmed = content[-15000:]
-                self.log_widget.setPlainText(trimmed)
+    def _append_log(self, line):
+        self._log_buf.append(line)
+        if len(self._log_buf) == 1:
+            QTimer.singleShot(50, self._flush_log)
 
-            # autoscroll
-            bar = self.log_widget.verticalScrollBar()
-            bar.setValue(bar.maximum())
+    def _flush_log(self):
+        lines, self._log_buf = self._log_buf, []
+        if not lines:
+            return
+        self.log_widget.appendPlainText("\n".join(lines))
 
-        except Exception:
-            print(line)
+        # autoscroll
+        self.log_widget.moveCursor(QTextCursor.End)
 
 
 def main():
@@ -0,0 +1,63 @@
+# src/model_utils.py
+"""
+Helpers shared by the basic (capital_budgeting.py) and extended
+(capital_budgeting_extended.py) models and the GUI: dataset column schema, CSV
+missing-value markers, sparse constraint blocks and the greedy MIP start.
+NumPy / SciPy only, no gurobipy.
+"""
+
+import numpy as np
+import scipy.sparse as sp
+
+# column dtypes known up front so the C parser converts in a single pass
+NUMERIC_COLS = ['cost', 'benefit', 'labour', 'land', 'social_score', 'priority']
+TEXT_COLS = ['proj_id', 'name', 'type', 'requires']
+# low-cardinality labels: integer codes make equality filters and groupby cheap
+CATEGORY_COLS = ['region', 'group', 'exclusive_group']
+
+# pandas' default missing-value markers, applied to the numeric columns only
+# (text columns keep e.g. a proj_id 'NA' as-is)
+NUMERIC_NA_VALUES = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+                     '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None',
+                     'n/a', 'nan', 'null']
+
+def greedy_start(cost_arr, benefit_arr, budget, K=None, R_mat=None, cap_arr=None):
+    """0/1 MIP start: longest prefix of projects, by decreasing benefit/cost ratio,
+    that fits the budget, the cardinality K and the resource caps (R_mat @ x <= cap_arr).
+    """
+    order = np.argsort(-benefit_arr / np.maximum(cost_arr, 1e-9), kind='stable')
+    fits = (np.cumsum(cost_arr[order]) <= budget) & (benefit_arr[order] > 0)
+    if K is not None:
+        fits &= np.arange(len(order)) < K
+    if R_mat is not None:
+        fits &= (np.cumsum(R_mat[:, order], axis=1) <= cap_arr[:, None]).all(axis=0)
+    n_take = len(order) if fits.all() else int(np.argmin(fits))
+    start = np.zeros(len(order))
+    start[order[:n_take]] = 1.0
+    return start
+
+def incidence_matrix(member_rows, n):
+    """Sparse 0/1 matrix with one row per list of column indices in `member_rows`."""
+    lengths = [len(r) for r in member_rows]
+    rows = np.repeat(np.arange(len(member_rows)), lengths)
+    cols = np.concatenate(member_rows)
+    return sp.csr_matrix((np.ones(len(cols)), (rows, cols)), shape=(len(member_rows), n))
+
+def dependency_matrix(i_idx, j_idx, n):
+    """Sparse matrix with one row per edge, +1 at j and -1 at i, so that A @ x <= 0
+    encodes x[j] <= x[i] (j requires i)."""
+    D = len(i_idx)
+    rows = np.arange(D)
+    data = np.concatenate([np.ones(D), -np.ones(D)])
+    cols = np.concatenate([j_idx, i_idx])
+    return sp.csr_matrix((data, (np.tile(rows, 2), cols)), shape=(D, n))
+
+def dependency_closure(start, i_idx, j_idx):
+    """Drop from a 0/1 start every project whose prerequisite is not selected
+    (edge j requires i), repeating until no edge is violated."""
+    start = start.copy()
+    while True:
+        broken = (start[j_idx] > 0.5) & (start[i_idx] < 0.5)
+        if not broken.any():
+            return start
+        start[j_idx[broken]] = 0.0
@@ -1,5 +1,6 @@
 # src/solver_thread.py
 from PyQt5.QtCore import QThread, pyqtSignal
+import threading
 import traceback
 
 # on importe ici la fonction build_solve que tu as : capital_budgeting_extended.build_solve
@@ -12,12 +13,17 @@ class SolverThread(QThread):
     """
     finished = pyqtSignal(dict)        # emission: {'status':'ok', 'solutions':..., 'msg': ''}
     error = pyqtSignal(str)            # emission: exception string
+    incumbent = pyqtSignal(dict)       # emission: {'selected': [...], 'obj': float} à chaque meilleure solution
 
     def __init__(self, df, budget, resource_caps=None, groups_exclusive=None,
                  dependencies=None, region_min_max=None, K=None,
-                 time_limit=30, pool_solutions=0, pool_gap=None, multi_crit_alpha=1.0):
+                 time_limit=30, pool_solutions=0, pool_gap=None, multi_crit_alpha=1.0,
+                 model_cache=None):
         super().__init__()
-        self.df = df.copy()
+        # copie superficielle : pendant la résolution la table est en lecture seule
+        # et import / ajout / suppression de lignes sont désactivés (ihm_main),
+        # donc build_solve (et son repli enumerate_k_best) lit une seule version
+        self.df = df.copy(deep=False)
         self.budget = budget
         self.resource_caps = resource_caps
         self.groups_exclusive = groups_exclusive
@@ -28,6 +34,15 @@ class SolverThread(QThread):
         self.pool_solutions = pool_solutions
         self.pool_gap = pool_gap
         self.multi_crit_alpha = multi_crit_alpha
+        # dict fourni par l'IHM : build_solve y garde le modèle Gurobi entre deux lancements
+        self.model_cache = model_cache
+        # arrêt coopératif : build_solve interrompt Gurobi dès que l'event est levé
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        """Demande l'arrêt du solveur; le résultat (meilleure solution trouvée) est
+        ensuite émis normalement via `finished`."""
+        self._cancel.set()
 
     def run(self):
         try:
@@ -42,9 +57,12 @@ class SolverThread(QThread):
                               time_limit=self.time_limit,
                               pool_solutions=self.pool_solutions,
                               pool_gap=self.pool_gap,
-                              multi_crit_alpha=self.multi_crit_alpha)
+                              multi_crit_alpha=self.multi_crit_alpha,
+                              cancel_event=self._cancel,
+                              on_incumbent=self.incumbent.emit,
+                              cache=self.model_cache)
             # renvoyer le dictionnaire tel quel
-            self.finished.emit({'status': 'ok', 'result': res})
+            self.finished.emit({'status': 'ok', 'result': res, 'cancelled': self._cancel.is_set()})
         except Exception as e:
             tb = traceback.format_exc()
             self.error.emit(f"Solver error: {str(e)}\n{tb}")
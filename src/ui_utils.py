@@ -1,59 +1,229 @@
 # src/ui_utils.py
+import os
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
-from PyQt5.QtWidgets import QTableWidgetItem
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+from PyQt5.QtWidgets import QHeaderView, QTableWidgetItem
+
+from model_utils import CATEGORY_COLS
+
+
+class PandasModel(QAbstractTableModel):
+    """
+    Modèle Qt (pour un QTableView) qui lit et écrit directement dans un DataFrame.
+    Aucune copie cellule par cellule : la vue ne demande que les cellules visibles.
+    """
+    # émis avec le nom de colonne quand une saisie ne peut pas être convertie
+    invalidValue = pyqtSignal(str)
+
+    def __init__(self, df=None, parent=None):
+        super().__init__(parent)
+        self._df = df if df is not None else pd.DataFrame()
+
+    @property
+    def df(self):
+        return self._df
+
+    def set_dataframe(self, df):
+        """Remplace le DataFrame affiché (une seule réinitialisation de la vue)."""
+        self.beginResetModel()
+        self._df = df
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._df.index)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._df.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+        val = self._df.iat[index.row(), index.column()]
+        return "" if pd.isna(val) else str(val)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return str(self._df.columns[section])
+        return str(section + 1)
+
+    def flags(self, index):
+        return super().flags(index) | Qt.ItemIsEditable
+
+    def _coerce(self, col, value):
+        """Convertit `value` au type de la colonne `col` (élargit int -> float ou
+        ajoute une catégorie si nécessaire). Lève ValueError si non numérique."""
+        s = self._df[col]
+        if pd.api.types.is_numeric_dtype(s):
+            value = float(value)
+            if pd.api.types.is_integer_dtype(s):
+                if value.is_integer():
+                    return int(value)
+                self._df[col] = s.astype(float)
+            return value
+        value = "" if value is None else str(value)
+        if isinstance(s.dtype, pd.CategoricalDtype) and value not in s.cat.categories:
+            self._df[col] = s.cat.add_categories([value])
+        return value
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        col = self._df.columns[index.column()]
+        try:
+            value = self._coerce(col, value)
+        except ValueError:
+            self.invalidValue.emit(str(col))
+            return False
+        self._df.iat[index.row(), index.column()] = value
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        return True
+
+    def insert_row(self, values=None):
+        """Ajoute une ligne en fin de tableau; colonnes absentes de `values` :
+        0 pour les numériques, '' sinon."""
+        values = values or {}
+        r = len(self._df.index)
+        row = []
+        for col in self._df.columns:
+            default = 0 if pd.api.types.is_numeric_dtype(self._df[col]) else ""
+            row.append(self._coerce(col, values.get(col, default)))
+        self.beginInsertRows(QModelIndex(), r, r)
+        self._df.loc[r] = row
+        self.endInsertRows()
+        return r
+
+    def remove_row(self, r):
+        """Supprime la ligne `r` (position) et renumérote l'index."""
+        self.beginRemoveRows(QModelIndex(), r, r)
+        self._df.drop(self._df.index[r], inplace=True)
+        self._df.reset_index(drop=True, inplace=True)
+        self.endRemoveRows()
 
 def df_to_qtable(table_widget, df):
     """
     Remplit un QTableWidget à partir d'un pandas DataFrame.
     Le QTableWidget est redimensionné pour correspondre aux colonnes/rows du df.
     """
-    table_widget.clear()
-    table_widget.setColumnCount(len(df.columns))
-    table_widget.setRowCount(len(df.index))
-    table_widget.setHorizontalHeaderLabels(list(df.columns))
+    # pas de repaint, de tri, de redimensionnement ni de itemChanged à chaque setItem
+    header = table_widget.horizontalHeader()
+    sorting = table_widget.isSortingEnabled()
+    blocked = table_widget.blockSignals(True)
+    table_widget.setUpdatesEnabled(False)
+    table_widget.setSortingEnabled(False)
+    header.setSectionResizeMode(QHeaderView.Fixed)
+    try:
+        table_widget.clear()
+        table_widget.setColumnCount(len(df.columns))
+        table_widget.setRowCount(len(df.index))
+        table_widget.setHorizontalHeaderLabels(list(df.columns))
 
-    for i, row in df.iterrows():
-        for j, col in enumerate(df.columns):
-            val = row[col]
-            item = QTableWidgetItem("" if pd.isna(val) else str(val))
-            table_widget.setItem(i, j, item)
+        # textes des cellules formatés en une passe vectorisée, puis NaN -> "" par
+        # masque NumPy ; la boucle ne fait plus que créer les items
+        texts = df.astype(str).to_numpy(dtype=object)
+        texts[df.isna().to_numpy()] = ""
+        for i in range(texts.shape[0]):
+            row = texts[i]
+            for j in range(texts.shape[1]):
+                table_widget.setItem(i, j, QTableWidgetItem(row[j]))
+    finally:
+        header.setSectionResizeMode(QHeaderView.Interactive)
+        table_widget.setSortingEnabled(sorting)
+        table_widget.setUpdatesEnabled(True)
+        table_widget.blockSignals(blocked)
     table_widget.resizeColumnsToContents()
 
-def qtable_to_df(table_widget):
+def qtable_to_df(table_widget, numeric_cols=None, string_cols=None):
     """
     Lit un QTableWidget et retourne un pandas DataFrame.
     Les en-têtes de colonne sont lus depuis le widget.
+    Schéma connu (ex. NUMERIC_COLS / TEXT_COLS de model_utils) :
+    `numeric_cols` sont converties directement (cellules invalides -> NaN), sans
+    détection sur les autres colonnes; `string_cols` restent toujours du texte.
     """
     n_rows = table_widget.rowCount()
     n_cols = table_widget.columnCount()
     headers = [table_widget.horizontalHeaderItem(c).text() for c in range(n_cols)]
-    data = []
+    # un seul tableau objet pré-alloué (les lignes vides sont gardées telles quelles)
+    data = np.empty((n_rows, n_cols), dtype=object)
     for r in range(n_rows):
-        row = []
-        # si row vide (tous items None), on ajoute une ligne vide
-        empty = True
         for c in range(n_cols):
             it = table_widget.item(r, c)
-            val = "" if it is None else it.text()
-            if val != "":
-                empty = False
-            row.append(val)
-        # on garde les lignes même vides (contrôle par UI si nécessaire)
-        data.append(row)
-    df = pd.DataFrame(data, columns=headers)
-    # Essaie de convertir les colonnes numériques classiques en numériques quand possible
-    for col in df.columns:
-        # On tente conversion si valeur non vide et ressemble à nombre
-        try:
-            df[col] = pd.to_numeric(df[col], errors='ignore')
-        except Exception:
-            pass
+            data[r, c] = "" if it is None else it.text()
+    df = pd.DataFrame(data, columns=headers, copy=False)
+    if numeric_cols is not None:
+        for col in df.columns.intersection(numeric_cols):
+            df[col] = pd.to_numeric(df[col].where(df[col] != ""), errors='coerce')
+        return df
+    # Convertit en numérique les colonnes dont toutes les cellules non vides sont des
+    # nombres (une passe to_numeric par colonne; cellules vides -> NaN)
+    for col in df.columns.difference(string_cols or [], sort=False):
+        s = df[col]
+        filled = s != ""
+        coerced = pd.to_numeric(s.where(filled), errors='coerce')
+        if filled.any() and coerced[filled].notna().all():
+            df[col] = coerced
     return df
 
-def load_csv_to_df(path):
-    df = pd.read_csv(path, dtype={'proj_id':str})
-    df.fillna('', inplace=True)
+@lru_cache(maxsize=16)
+def _read_csv_cached(path, mtime_ns, size):
+    # mtime/size font partie de la clé : un fichier modifié est relu automatiquement
+    try:
+        # parseur pyarrow (multi-thread) si disponible, sinon parseur C de pandas ;
+        # pandas lève ValueError avec dtype= quand une colonne d'entiers a des cases vides
+        df = pd.read_csv(path, dtype={'proj_id':str}, engine='pyarrow')
+    except (ImportError, ValueError):
+        df = pd.read_csv(path, dtype={'proj_id':str}, memory_map=True)
+    # '' seulement dans les colonnes texte : les numériques gardent leur dtype (NaN)
+    text_cols = df.select_dtypes(exclude='number').columns
+    df[text_cols] = df[text_cols].fillna('')
+    # libellés peu variés (région, groupes) : codes entiers, moins de mémoire
+    cat_cols = [c for c in CATEGORY_COLS if c in df.columns]
+    df[cat_cols] = df[cat_cols].astype('category')
     return df
 
+def load_csv_to_df(path):
+    """
+    Charge un CSV de projets. Les fichiers déjà lus (même chemin, même date de
+    modification et taille) ne sont pas re-parsés : on renvoie une copie du
+    DataFrame en cache, que l'appelant peut modifier librement.
+    """
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    return _read_csv_cached(path, st.st_mtime_ns, st.st_size).copy()
+
 def save_df_to_csv(df, path):
     df.to_csv(path, index=False)
+
+# formats binaires (colonnes typées, plus compacts et rapides que le CSV pour les
+# grandes tables) ; Parquet et Feather demandent pyarrow, HDF5 demande PyTables ('tables')
+FILE_FILTERS = "CSV Files (*.csv);;Parquet (*.parquet);;Feather (*.feather);;HDF5 (*.h5)"
+HDF_KEY = 'projects'
+
+def load_df(path):
+    """Charge un tableau de projets selon l'extension (.csv, .parquet, .feather, .h5)."""
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix == '.parquet':
+        return pd.read_parquet(path)
+    if suffix == '.feather':
+        return pd.read_feather(path)
+    if suffix in ('.h5', '.hdf5'):
+        return pd.read_hdf(path, HDF_KEY)
+    return load_csv_to_df(path)
+
+def save_df(df, path):
+    """Enregistre un tableau de projets selon l'extension (.csv, .parquet, .feather, .h5)."""
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix == '.parquet':
+        df.to_parquet(path, index=False)
+    elif suffix == '.feather':
+        # Feather n'enregistre pas l'index : il doit être un RangeIndex par défaut
+        df.reset_index(drop=True).to_feather(path)
+    elif suffix in ('.h5', '.hdf5'):
+        df.to_hdf(path, key=HDF_KEY, mode='w', format='table')
+    else:
+        save_df_to_csv(df, path)